@@ -3,12 +3,13 @@
 from src.env import load_env
 load_env()  # Load environment variables first
 
-from src.config import Config
+from src.config import get_config
 from src.logger import logger
 from src.fetch_whales import fetch_whale_transactions
 from src.fetch_price import fetch_token_price_history
 from src.process_data import preprocess_data
-from src.analyse import analyze_correlation, plot_price_vs_whale
+from src.analyse import analyze_correlation
+from src.plot import plot_price_vs_whale
 # from src.plot import plot_price_vs_whale_scatter  # Optional scatter plot
 
 
@@ -16,7 +17,7 @@ def main():
     logger.info("🚀 Starting Whale Activity Analysis Pipeline...")
 
     # Load configuration
-    cfg = Config()
+    cfg = get_config()
 
     # Step 1: Fetch token price history
     try:
@@ -54,7 +55,7 @@ def main():
     # Step 4: Analyze correlation
     try:
         merged_df, correlation = analyze_correlation(price_df, whale_df, cfg)
-        method = cfg.get("analysis", "correlation_method", default="pearson")
+        method = cfg.correlation_method
         if correlation is not None:
             logger.info(f"{method.title()} correlation: {correlation:.4f}")
         else:
@@ -0,0 +1,66 @@
+# src/_corr_kernels.py
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _average_ranks(x: np.ndarray) -> np.ndarray:
+    """
+    Rank values from 1..n, giving tied values the average of their ranks
+    (same convention as pandas' Series.rank()).
+
+    Args:
+        x (np.ndarray): 1-D float array without NaNs.
+
+    Returns:
+        np.ndarray: Float ranks aligned with x.
+    """
+    n = x.shape[0]
+    order = np.argsort(x, kind="mergesort")
+    ranks = np.empty(n, dtype=np.float64)
+
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and x[order[j + 1]] == x[order[i]]:
+            j += 1
+        avg_rank = 0.5 * (i + j) + 1.0
+        for k in range(i, j + 1):
+            ranks[order[k]] = avg_rank
+        i = j + 1
+
+    return ranks
+
+
+@njit(cache=True, fastmath=True)
+def spearman_jit(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    Spearman rank correlation of two equal-length arrays.
+
+    Args:
+        x (np.ndarray): 1-D float array without NaNs.
+        y (np.ndarray): 1-D float array without NaNs.
+
+    Returns:
+        float: Spearman correlation, or NaN if either input is constant.
+    """
+    rx = _average_ranks(x)
+    ry = _average_ranks(y)
+
+    # Average ranks always have mean (n + 1) / 2, so one pass is enough
+    n = rx.shape[0]
+    mean_rank = 0.5 * (n + 1)
+    sxy = 0.0
+    sxx = 0.0
+    syy = 0.0
+    for i in range(n):
+        dx = rx[i] - mean_rank
+        dy = ry[i] - mean_rank
+        sxy += dx * dy
+        sxx += dx * dx
+        syy += dy * dy
+
+    if sxx == 0.0 or syy == 0.0:
+        return np.nan
+    return sxy / np.sqrt(sxx * syy)
@@ -1,11 +1,13 @@
 # src/analyse.py
 
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from pathlib import Path
 from typing import Tuple, Optional
 
 from src.logger import logger
+from src.plot import plot_price_vs_whale  # re-exported; the implementation lives in src.plot
+from src.storage import save_frame
 
 
 def analyze_correlation(price_df: pd.DataFrame, whale_df: pd.DataFrame, cfg) -> Tuple[pd.DataFrame, Optional[float]]:
@@ -25,7 +27,7 @@ def analyze_correlation(price_df: pd.DataFrame, whale_df: pd.DataFrame, cfg) ->
     logger.info("Starting correlation analysis...")
 
     try:
-        method = cfg.get("analysis", "correlation_method", default="pearson").lower()
+        method = cfg.correlation_method
 
         if method not in {"pearson", "spearman", "kendall"}:
             raise ValueError(f"Unsupported correlation method: {method}")
@@ -33,19 +35,49 @@ def analyze_correlation(price_df: pd.DataFrame, whale_df: pd.DataFrame, cfg) ->
         results_path = cfg.get_path("paths", "results")
         results_path.mkdir(parents=True, exist_ok=True)
 
-        # Merge price and whale data on 'date'
-        merged_df = pd.merge(price_df, whale_df, on="date", how="inner")
+        # Drop missing values on each side first so the joined frame is built only once
+        price_df = price_df.dropna(subset=["price"])
+        whale_df = whale_df.dropna(subset=["usd_value"])
+
+        # Join price and whale data on a sorted 'date' index (one price row per day)
+        merged_df = (
+            price_df.set_index("date").sort_index()
+            .join(whale_df.set_index("date").sort_index(), how="inner", validate="one_to_many")
+            .reset_index()
+        )
         logger.info(f"Merged DataFrame shape: {merged_df.shape}")
 
-        merged_df = merged_df.dropna(subset=["price", "usd_value"])
         if merged_df.empty:
             raise ValueError("Merged data is empty after dropping missing values.")
 
-        correlation = merged_df["price"].corr(merged_df["usd_value"], method=method)
+        arr = merged_df[["price", "usd_value"]].to_numpy(dtype=np.float64, copy=False)
+
+        if len(arr) < 2 or np.ptp(arr[:, 0]) == 0 or np.ptp(arr[:, 1]) == 0:
+            # Correlation is undefined here; record NaN explicitly rather than letting corrcoef warn
+            logger.warning(f"Correlation undefined for {len(arr)} merged row(s) or a constant column; recording NaN")
+            correlation = float("nan")
+        elif method == "pearson":
+            correlation = float(np.corrcoef(arr, rowvar=False)[0, 1])
+        elif method == "spearman":
+            # Imported here so runs that never rank don't pay numba's import cost
+            try:
+                from src._corr_kernels import spearman_jit
+            except ImportError:  # numba not installed
+                spearman_jit = None
+
+            if spearman_jit is not None:
+                correlation = float(spearman_jit(arr[:, 0], arr[:, 1]))
+            else:
+                # Rank once, then Pearson on the ranks (avoids pandas' slow Spearman path)
+                rx = pd.Series(arr[:, 0]).rank().to_numpy()
+                ry = pd.Series(arr[:, 1]).rank().to_numpy()
+                correlation = float(np.corrcoef(rx, ry)[0, 1])
+        else:
+            correlation = merged_df["price"].corr(merged_df["usd_value"], method=method)
         logger.info(f"{method.title()} correlation: {correlation:.4f}")
 
         # Save results
-        merged_df.to_csv(results_path / "merged_price_whale.csv", index=False)
+        save_frame(merged_df, results_path / "merged_price_whale", cfg)
         with open(results_path / "correlation.txt", "w") as f:
             f.write(f"{method.title()} correlation between price and whale volume: {correlation:.4f}\n")
 
@@ -54,44 +86,3 @@ def analyze_correlation(price_df: pd.DataFrame, whale_df: pd.DataFrame, cfg) ->
     except Exception as e:
         logger.error(f"Correlation analysis failed: {e}")
         return pd.DataFrame(), None
-
-
-def plot_price_vs_whale(price_df: pd.DataFrame, whale_df: pd.DataFrame, cfg) -> None:
-    """
-    Plot token price and whale transaction volume over time and save the figure.
-
-    Args:
-        price_df (pd.DataFrame): Token price data.
-        whale_df (pd.DataFrame): Whale transaction volume data.
-        cfg (Config): Configuration object.
-    """
-    logger.info("Plotting token price vs whale activity...")
-
-    try:
-        figures_path = cfg.get_path("paths", "figures")
-        figures_path.mkdir(parents=True, exist_ok=True)
-
-        # Get plot settings from config
-        figsize = tuple(cfg.get("plot", "figsize", default=[12, 6]))
-        price_color = cfg.get("plot", "price_color", default="blue")
-        whale_color = cfg.get("plot", "whale_color", default="orange")
-
-        # Plotting
-        plt.figure(figsize=figsize)
-        plt.plot(price_df["date"], price_df["price"], label="Token Price", color=price_color)
-        plt.bar(whale_df["date"], whale_df["usd_value"], label="Whale Volume", color=whale_color, alpha=0.5)
-
-        plt.title("Token Price vs Whale Activity")
-        plt.xlabel("Date")
-        plt.ylabel("USD Value")
-        plt.legend()
-        plt.tight_layout()
-
-        plot_file = figures_path / "price_vs_whale.png"
-        plt.savefig(plot_file)
-        plt.close()
-
-        logger.info(f"Plot saved to: {plot_file}")
-
-    except Exception as e:
-        logger.error(f"Plotting failed: {e}")
@@ -0,0 +1,49 @@
+# src/cache.py
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import orjson
+
+from src.logger import logger
+
+
+def load_cached_json(cache_file: Path, max_age: Optional[float] = None) -> Any:
+    """
+    Load a cached JSON payload from disk.
+
+    Args:
+        cache_file (Path): Location of the cached payload.
+        max_age (Optional[float]): Maximum age in seconds; None never expires.
+
+    Returns:
+        Any: Decoded payload, or None if missing, expired or unreadable.
+    """
+    try:
+        if max_age is not None and time.time() - cache_file.stat().st_mtime > max_age:
+            return None
+        return orjson.loads(cache_file.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable cache file {cache_file}: {e}")
+        return None
+
+
+def save_cached_json(cache_file: Path, data: Any) -> None:
+    """
+    Atomically write a JSON payload to the cache.
+
+    Args:
+        cache_file (Path): Destination of the cached payload.
+        data (Any): JSON-serialisable payload.
+    """
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        tmp_file.write_bytes(orjson.dumps(data))
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning(f"Could not write cache file {cache_file}: {e}")
@@ -1,10 +1,14 @@
 # src/config.py
 
 import yaml
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime, timezone
 import os
 
+# Use the libyaml-backed loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class Config:
     def __init__(self, config_path: str = "config.yaml"):
@@ -17,6 +21,26 @@ class Config:
         self.config_path = config_path
         self.config_data = self._load_config()
 
+        # Flattened (a, b, c) -> value view of config_data for single-lookup get()
+        self._flat = self._flatten(self.config_data)
+
+        # Resolve the analysis window once; fetchers reuse these instead of re-parsing
+        self.start_date = self.get_date("analysis", "start_date")
+        self.end_date = self.get_date("analysis", "end_date")
+        self.start_ts = self._utc_timestamp(self.start_date)
+        self.end_ts = self._utc_timestamp(self.end_date)
+
+        # Hot-path settings read by analysis and plotting
+        self.correlation_method = self.get("analysis", "correlation_method", default="pearson").lower()
+        self.figsize = tuple(self.get("plot", "figsize", default=(12, 6)))
+
+        # Validated up front so a bad value fails before any data is fetched
+        self.top_k_sort = self.get("analysis", "top_k_sort", default=None)
+        if self.top_k_sort is not None and (
+            isinstance(self.top_k_sort, bool) or not isinstance(self.top_k_sort, int) or self.top_k_sort < 0
+        ):
+            raise ValueError(f"analysis.top_k_sort must be a non-negative integer, got {self.top_k_sort!r}")
+
     def _load_config(self) -> dict:
         """
         Load and parse the YAML configuration file.
@@ -30,7 +54,45 @@ class Config:
         if not os.path.exists(self.config_path):
             raise FileNotFoundError(f"Config file not found: {self.config_path}")
         with open(self.config_path, "r") as f:
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=_YAML_LOADER)
+
+    @staticmethod
+    def _flatten(data, prefix: tuple = ()) -> dict:
+        """
+        Flatten nested config dicts into key-path tuples.
+
+        Every level is kept, so intermediate sections remain addressable. Keys
+        are kept as-is, so non-string and dotted YAML keys cannot collide.
+
+        Args:
+            data: Parsed config (or a nested section of it).
+            prefix (tuple): Key path of the current section.
+
+        Returns:
+            dict: Mapping of (key, subkey, ...) paths to their values.
+        """
+        flat = {}
+        if isinstance(data, dict):
+            for key, value in data.items():
+                path = prefix + (key,)
+                flat[path] = value
+                flat.update(Config._flatten(value, path))
+        return flat
+
+    @staticmethod
+    def _utc_timestamp(dt: datetime | None) -> int | None:
+        """
+        Convert a naive date (interpreted as UTC midnight) to a unix timestamp.
+
+        Args:
+            dt (datetime | None): Parsed config date.
+
+        Returns:
+            int | None: Seconds since the epoch, or None if dt is None.
+        """
+        if dt is None:
+            return None
+        return int(dt.replace(tzinfo=timezone.utc).timestamp())
 
     def get(self, *keys, default=None):
         """
@@ -43,13 +105,9 @@ class Config:
         Returns:
             Any: The resolved value or default.
         """
-        val = self.config_data
-        for key in keys:
-            if isinstance(val, dict) and key in val:
-                val = val[key]
-            else:
-                return default
-        return val
+        if not keys:
+            return self.config_data
+        return self._flat.get(keys, default)
 
     def get_path(self, *keys) -> Path | None:
         """
@@ -77,9 +135,10 @@ class Config:
         """
         date_str = self.get(*keys)
         if date_str:
+            # date.fromisoformat rejects times and UTC offsets, which _utc_timestamp would drop
             try:
-                return datetime.strptime(date_str, "%Y-%m-%d")
-            except ValueError:
+                return datetime.combine(date.fromisoformat(date_str), datetime.min.time())
+            except (TypeError, ValueError):
                 raise ValueError(f"Invalid date format for key path: {' > '.join(keys)}")
         return default
 
@@ -101,3 +160,17 @@ class Config:
         if not env_var:
             raise KeyError(f"Missing environment variable name in config for key path: {' > '.join(keys)}")
         return os.getenv(env_var, fallback)
+
+
+@lru_cache(maxsize=1)
+def get_config(config_path: str = "config.yaml") -> Config:
+    """
+    Return the process-wide Config, parsing the YAML file only once.
+
+    Args:
+        config_path (str): Path to the configuration YAML file.
+
+    Returns:
+        Config: Shared configuration instance.
+    """
+    return Config(config_path)
@@ -1,10 +1,86 @@
 # src/fetch_price.py
 
+import time
+import orjson
 import requests
 import pandas as pd
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from src.cache import load_cached_json, save_cached_json
 from src.env import get_api_key
 from src.logger import logger
+from src.session import create_session
+from src.storage import save_frame
+
+# Concurrent CoinGecko requests; kept low to respect the API rate limit
+MAX_PRICE_WORKERS = 5
+
+# Width of each market_chart/range request
+PRICE_WINDOW_SECONDS = 90 * 86400
+
+
+def fetch_price_chunk(base_url: str, token_name: str, vs_currency: str,
+                      from_ts: int, to_ts: int, session: requests.Session,
+                      cache_dir: Optional[Path] = None) -> list:
+    """
+    Fetch [timestamp_ms, price] pairs for a single date window from CoinGecko.
+
+    Args:
+        base_url (str): CoinGecko API base URL.
+        token_name (str): CoinGecko token ID.
+        vs_currency (str): Quote currency.
+        from_ts (int): Window start as a unix timestamp.
+        to_ts (int): Window end as a unix timestamp.
+        session (requests.Session): Session carrying the CoinGecko headers.
+        cache_dir (Optional[Path]): Directory for caching completed windows.
+
+    Returns:
+        list: Price points returned for the window.
+    """
+    # Windows that ended more than a day ago are immutable, so they can be cached
+    cache_file = None
+    if cache_dir is not None and to_ts < time.time() - 86400:
+        cache_file = cache_dir / f"{token_name}_{vs_currency}_{from_ts}_{to_ts}.json"
+        cached = load_cached_json(cache_file)
+        if cached is not None:
+            logger.debug(f"Loaded cached CoinGecko prices: {cache_file}")
+            return cached
+
+    url = f"{base_url}/coins/{token_name}/market_chart/range"
+    params = {
+        "vs_currency": vs_currency,
+        "from": from_ts,
+        "to": to_ts
+    }
+
+    window_start = datetime.fromtimestamp(from_ts, tz=timezone.utc).date()
+    window_end = datetime.fromtimestamp(to_ts, tz=timezone.utc).date()
+    logger.info(f"Fetching prices from {window_start} to {window_end}...")
+    debug_url = requests.Request("GET", url, params=params).prepare().url
+    logger.debug(f"Requesting CoinGecko API URL: {debug_url}")
+
+    try:
+        response = session.get(url, params=params)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        prices = data.get("prices", [])
+        if cache_file is not None and prices:
+            save_cached_json(cache_file, prices)
+    except requests.exceptions.HTTPError as err:
+        logger.warning(f"Range API failed: {err}. Trying fallback endpoint with 'days' param.")
+        fallback_url = f"{base_url}/coins/{token_name}/market_chart"
+        fallback_params = {"vs_currency": vs_currency, "days": "90"}
+        fallback_debug_url = requests.Request("GET", fallback_url, params=fallback_params).prepare().url
+        logger.debug(f"Requesting fallback CoinGecko API URL: {fallback_debug_url}")
+        response = session.get(fallback_url, params=fallback_params)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        prices = data.get("prices", [])
+
+    return prices
+
 
 def fetch_token_price_history(cfg) -> pd.DataFrame:
     logger.info("Fetching token price history from CoinGecko...")
@@ -13,71 +89,44 @@ def fetch_token_price_history(cfg) -> pd.DataFrame:
         # Load configuration
         token_name = cfg.get("token", "name")
         vs_currency = cfg.get("token", "vs_currency")
-        start_date = cfg.get("analysis", "start_date")
-        end_date = cfg.get("analysis", "end_date")
         base_url = cfg.get("api", "coingecko", "base_url")
         api_key = get_api_key("coingecko", cfg)
 
-        if not all([token_name, vs_currency, start_date, end_date]):
+        if not all([token_name, vs_currency, cfg.start_ts, cfg.end_ts]):
             raise ValueError("Missing required token or date configuration values.")
 
-        # Build headers
-        headers = {"accept": "application/json"}
+        # Build headers once on a shared session (reused by every chunk request)
+        session = create_session()
+        session.headers["accept"] = "application/json"
         if api_key:
-            headers["x-cg-pro-api-key"] = api_key
+            session.headers["x-cg-pro-api-key"] = api_key
 
         # Ping CoinGecko API to test key & base_url
         try:
             ping_url = f"{base_url}/ping"
-            ping_response = requests.get(ping_url, headers=headers)
+            ping_response = session.get(ping_url)
             ping_response.raise_for_status()
-            logger.debug(f"Ping success: {ping_response.json()}")
+            logger.debug(f"Ping success: {orjson.loads(ping_response.content)}")
         except Exception as e:
             logger.error(f"CoinGecko API key may be invalid or base_url is incorrect: {e}")
             return pd.DataFrame()
 
-        # Convert date strings to UTC datetime
-        start_dt = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-        end_dt = datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-
-        # Fetch prices in 90-day chunks
-        all_prices = []
-        current_start = start_dt
-
-        while current_start < end_dt:
-            current_end = min(current_start + timedelta(days=90), end_dt)
-            from_ts = int(current_start.timestamp())
-            to_ts = int(current_end.timestamp())
-
-            url = f"{base_url}/coins/{token_name}/market_chart/range"
-            params = {
-                "vs_currency": vs_currency,
-                "from": from_ts,
-                "to": to_ts
-            }
-
-            logger.info(f"Fetching prices from {current_start.date()} to {current_end.date()}...")
-            debug_url = requests.Request("GET", url, params=params).prepare().url
-            logger.debug(f"Requesting CoinGecko API URL: {debug_url}")
-
-            try:
-                response = requests.get(url, params=params, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-                prices = data.get("prices", [])
-            except requests.exceptions.HTTPError as err:
-                logger.warning(f"Range API failed: {err}. Trying fallback endpoint with 'days' param.")
-                fallback_url = f"{base_url}/coins/{token_name}/market_chart"
-                fallback_params = {"vs_currency": vs_currency, "days": "90"}
-                fallback_debug_url = requests.Request("GET", fallback_url, params=fallback_params).prepare().url
-                logger.debug(f"Requesting fallback CoinGecko API URL: {fallback_debug_url}")
-                response = requests.get(fallback_url, params=fallback_params, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-                prices = data.get("prices", [])
-
-            all_prices.extend(prices)
-            current_start = current_end
+        cache_dir = cfg.get_path("paths", "cache")
+
+        # Split the range into 90-day windows and fetch them concurrently
+        windows = [
+            (from_ts, min(from_ts + PRICE_WINDOW_SECONDS, cfg.end_ts))
+            for from_ts in range(cfg.start_ts, cfg.end_ts, PRICE_WINDOW_SECONDS)
+        ]
+
+        def fetch_window(window):
+            from_ts, to_ts = window
+            return fetch_price_chunk(base_url, token_name, vs_currency, from_ts, to_ts, session, cache_dir)
+
+        # map() yields results in window order, but a window that fell back to the
+        # latest 90 days is out of sequence, so the groupby below sorts by date
+        with session, ThreadPoolExecutor(max_workers=MAX_PRICE_WORKERS) as executor:
+            all_prices = [price for prices in executor.map(fetch_window, windows) for price in prices]
 
         if not all_prices:
             logger.warning("No price data found in CoinGecko response.")
@@ -85,14 +134,14 @@ def fetch_token_price_history(cfg) -> pd.DataFrame:
 
         # Process into DataFrame
         price_df = pd.DataFrame(all_prices, columns=["timestamp", "price"])
-        price_df["date"] = pd.to_datetime(price_df["timestamp"], unit="ms").dt.strftime("%Y-%m-%d")
-        price_df = price_df.groupby("date", as_index=False).mean()[["date", "price"]]
+        # Truncate to native datetime64 days and average per day in date order
+        price_df["date"] = pd.to_datetime(price_df["timestamp"], unit="ms").values.astype("datetime64[D]")
+        price_df = price_df.groupby("date", as_index=False)["price"].mean()
 
-        # Save to CSV
+        # Save in the configured format (Parquet by default)
         raw_data_path = cfg.get_path("paths", "raw_data")
         raw_data_path.mkdir(parents=True, exist_ok=True)
-        output_file = raw_data_path / f"{token_name}_price_data.csv"
-        price_df.to_csv(output_file, index=False)
+        output_file = save_frame(price_df, raw_data_path / f"{token_name}_price_data", cfg)
 
         logger.info(f"Token price data saved to: {output_file}")
         return price_df
@@ -1,41 +1,123 @@
 # src/fetch_whales.py - FINAL FIXED VERSION
 
+import numpy as np
+import orjson
 import requests
 import pandas as pd
+from src.cache import load_cached_json, save_cached_json
 from src.env import get_api_key
 from src.logger import logger
-from datetime import datetime
+from src.session import create_session
+from src.storage import save_frame
+from datetime import date
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
+# Default number of concurrent Helius wallet requests (api.helius.concurrency)
+MAX_WALLET_WORKERS = 16
 
-def get_token_price_usd(date_str: str, price_df: pd.DataFrame) -> float:
+# (connect, read) timeout in seconds for Helius requests
+HELIUS_TIMEOUT = (5, 30)
+
+# Unix timestamps beyond this (about the year 2262) overflow pandas datetimes
+MAX_TIMESTAMP_SECONDS = 9.2e9
+
+# Output schema of fetch_whale_transactions
+WHALE_COLUMNS = [
+    "wallet", "type", "amount", "usd_value", "from", "to",
+    "timestamp", "date", "signature", "token_address", "token_symbol"
+]
+
+# Fields buffered per raw transfer before valuation (token transfers add the mint)
+TRANSFER_COLUMNS = ["wallet", "amount", "price_usd", "from", "to", "timestamp", "date", "signature"]
+
+# Native SOL and wrapped SOL share this mint address
+SOL_MINT = "So11111111111111111111111111111111111111112"
+
+# Known SPL mints: mint -> (symbol, unit price in USD). A None price means the
+# token tracks SOL and is valued at the day's SOL price. Unknown mints are
+# labelled by address prefix and assumed to be worth $1.
+TOKEN_TABLE = {
+    SOL_MINT: ("wSOL", None),
+    "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v": ("USDC", 1.0),
+    "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB": ("USDT", 1.0),
+}
+
+# Column-wise views of TOKEN_TABLE for Series.map
+_TOKEN_SYMBOLS = {mint: symbol for mint, (symbol, _) in TOKEN_TABLE.items()}
+_TOKEN_UNIT_PRICES = {mint: price for mint, (_, price) in TOKEN_TABLE.items() if price is not None}
+_SOL_PRICED_MINTS = [mint for mint, (_, price) in TOKEN_TABLE.items() if price is None]
+
+
+def _as_float(value) -> float:
+    """
+    Convert a raw JSON value to float, mapping missing or non-numeric values to NaN.
+
+    Args:
+        value: Value taken from a Helius payload.
+
+    Returns:
+        float: The numeric value, or NaN if it cannot be converted.
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def build_price_map(price_df: pd.DataFrame) -> Tuple[Dict[str, float], Optional[float]]:
+    """
+    Index daily token prices by YYYY-MM-DD string for constant-time lookups.
+
+    Args:
+        price_df (pd.DataFrame): DataFrame with columns ['date', 'price'].
+
+    Returns:
+        Tuple[Dict[str, float], Optional[float]]: Date -> price map and the most
+        recent price (None if price_df is empty).
+    """
+    if price_df.empty:
+        return {}, None
+
+    unique_prices = price_df.drop_duplicates("date")
+    dates = pd.to_datetime(unique_prices["date"])
+    price_map = dict(zip(dates.dt.strftime("%Y-%m-%d"), unique_prices["price"].astype(float).tolist()))
+
+    # Take the latest date's price rather than trusting row order
+    latest_price = float(unique_prices["price"].iloc[dates.argmax()])
+    return price_map, latest_price
+
+
+def get_token_price_usd(date_str: str, price_map: Dict[str, float], latest_price: Optional[float]) -> float:
     """
     Get the token (SOL) price in USD for a specific date.
     If exact date not found, use the most recent available price.
 
     Args:
         date_str (str): Date in YYYY-MM-DD format.
-        price_df (pd.DataFrame): DataFrame with columns ['date', 'price'].
+        price_map (Dict[str, float]): Date -> price map from build_price_map.
+        latest_price (Optional[float]): Most recent price, None if there is no price data.
 
     Returns:
         float: Price in USD or most recent price if date not found.
     """
     # Try exact date match first
-    price_row = price_df[price_df["date"] == date_str]
-    if not price_row.empty:
-        return float(price_row["price"].iloc[0])
-    
+    price = price_map.get(date_str)
+    if price is not None:
+        return price
+
     # If exact date not found, use the most recent price
-    if not price_df.empty:
-        latest_price = float(price_df["price"].iloc[-1])
-        logger.debug(f"No price data for {date_str}, using latest price: ${latest_price:.2f}")
+    if latest_price is not None:
+        logger.debug("No price data for %s, using latest price: $%.2f", date_str, latest_price)
         return latest_price
-    
+
     logger.warning(f"No price data available at all!")
     return 0.0
 
 
-def fetch_transactions_for_wallet(address: str, api_key: str, base_url: str, limit: int = 100) -> list:
+def fetch_transactions_for_wallet(address: str, api_key: str, base_url: str, limit: int = 100,
+                                  session: Optional[requests.Session] = None) -> list:
     """
     Fetch transfer transactions for a wallet using the Helius API.
 
@@ -44,6 +126,7 @@ def fetch_transactions_for_wallet(address: str, api_key: str, base_url: str, lim
         api_key (str): Helius API key.
         base_url (str): Base URL for Helius address endpoint.
         limit (int): Max number of transactions to fetch.
+        session (Optional[requests.Session]): Shared session to reuse connections.
 
     Returns:
         list: Parsed JSON response with transactions.
@@ -59,9 +142,90 @@ def fetch_transactions_for_wallet(address: str, api_key: str, base_url: str, lim
     safe_params["api-key"] = "***REDACTED***"
     logger.debug(f"Requesting Helius API URL: {url} with params: {safe_params}")
 
-    response = requests.get(url, params=params)
+    http = session or requests
+    response = http.get(url, params=params, timeout=HELIUS_TIMEOUT)
     response.raise_for_status()
-    return response.json()
+    return orjson.loads(response.content)
+
+
+def build_whale_frame(native_rows: list, token_rows: list, whale_threshold: float) -> pd.DataFrame:
+    """
+    Value buffered transfers in USD and keep those at or above the whale threshold.
+
+    Args:
+        native_rows (list): Native SOL transfer tuples ordered as TRANSFER_COLUMNS,
+            with the amount in lamports.
+        token_rows (list): Token transfer tuples ordered as TRANSFER_COLUMNS plus
+            the mint, with the amount already in token units.
+        whale_threshold (float): Minimum USD value of a whale transfer.
+
+    Returns:
+        pd.DataFrame: Whale transfers with WHALE_COLUMNS.
+    """
+    # Missing, non-numeric and non-finite amounts all become NaN and are counted as invalid
+    native_df = pd.DataFrame.from_records(native_rows, columns=TRANSFER_COLUMNS)
+    native_amount = pd.to_numeric(native_df["amount"], errors="coerce").replace([np.inf, -np.inf], np.nan)
+    native_df["amount"] = native_amount / 1e9  # lamports -> SOL
+    native_df["usd_value"] = native_df["amount"] * native_df["price_usd"]
+
+    token_df = pd.DataFrame.from_records(token_rows, columns=TRANSFER_COLUMNS + ["token_address"])
+    token_df["amount"] = pd.to_numeric(token_df["amount"], errors="coerce").replace([np.inf, -np.inf], np.nan)
+    mints = token_df["token_address"]
+    unit_price = mints.map(_TOKEN_UNIT_PRICES).fillna(1.0)
+    unit_price = unit_price.mask(mints.isin(_SOL_PRICED_MINTS), token_df["price_usd"])
+    token_df["usd_value"] = token_df["amount"] * unit_price
+
+    invalid = int(native_df["amount"].isna().sum() + token_df["amount"].isna().sum())
+    if invalid:
+        logger.warning(f"Skipped {invalid} transfers with a missing, non-numeric or non-finite amount")
+
+    native_df = native_df[native_df["usd_value"] >= whale_threshold]
+    token_df = token_df[token_df["usd_value"] >= whale_threshold]
+    logger.info(f"Whale transfers: {len(native_df)} native SOL, {len(token_df)} token")
+
+    token_symbols = token_df["token_address"].map(_TOKEN_SYMBOLS)
+    token_symbols = token_symbols.fillna("TOKEN-" + token_df["token_address"].str[:8] + "...")
+
+    whale_df = pd.concat([
+        native_df.assign(type="NATIVE_SOL", token_address=SOL_MINT, token_symbol=None),
+        token_df.assign(type="TOKEN", token_symbol=token_symbols),
+    ], ignore_index=True)
+    whale_df["amount"] = whale_df["amount"].astype(np.float64)
+    whale_df["usd_value"] = whale_df["usd_value"].astype(np.float64)
+    whale_df["timestamp"] = pd.to_datetime(whale_df["timestamp"].astype(np.int64), unit="s")
+    return whale_df[WHALE_COLUMNS]
+
+
+def fetch_transactions_cached(address: str, api_key: str, base_url: str, cache_dir: Optional[Path],
+                              ttl_seconds: float, limit: int = 100,
+                              session: Optional[requests.Session] = None) -> list:
+    """
+    Fetch wallet transactions, reusing a recent on-disk copy when available.
+
+    Args:
+        address (str): Solana wallet address.
+        api_key (str): Helius API key.
+        base_url (str): Base URL for Helius address endpoint.
+        cache_dir (Optional[Path]): Cache directory; None disables caching.
+        ttl_seconds (float): Maximum age of a cached response.
+        limit (int): Max number of transactions to fetch.
+        session (Optional[requests.Session]): Shared session to reuse connections.
+
+    Returns:
+        list: Parsed JSON response with transactions.
+    """
+    if cache_dir is None:
+        return fetch_transactions_for_wallet(address, api_key, base_url, limit, session=session)
+
+    cache_file = cache_dir / f"helius_{address}_{limit}_{date.today():%Y%m%d}.json"
+    cached = load_cached_json(cache_file, max_age=ttl_seconds)
+    if cached is not None:
+        logger.debug(f"Loaded cached Helius transactions for {address}")
+        return cached
+
+    txs = fetch_transactions_for_wallet(address, api_key, base_url, limit, session=session)
+    save_cached_json(cache_file, txs)
+    return txs
 
 
 def fetch_whale_transactions(cfg, price_df: pd.DataFrame) -> pd.DataFrame:
@@ -80,12 +244,12 @@ def fetch_whale_transactions(cfg, price_df: pd.DataFrame) -> pd.DataFrame:
     helius_key = get_api_key("helius", cfg)
     base_url = cfg.get("api", "helius", "base_url")
     
-    whale_threshold = cfg.get("analysis", "whale_threshold_usd", default=100)
-    logger.info(f"Using whale threshold: ${whale_threshold:,}")
+    whale_threshold = float(cfg.get("analysis", "whale_threshold_usd", default=100))
+    logger.info(f"Using whale threshold: ${whale_threshold:,.2f}")
     
     # Get date range for filtering (but make it optional for debugging)
-    start_date = cfg.get_date("analysis", "start_date")
-    end_date = cfg.get_date("analysis", "end_date")
+    start_date = cfg.start_date
+    end_date = cfg.end_date
     logger.info(f"Date range: {start_date.date() if start_date else 'None'} to {end_date.date() if end_date else 'None'}")
     
     address_file = Path(cfg.get("analysis", "top_addresses_file"))
@@ -94,124 +258,106 @@ def fetch_whale_transactions(cfg, price_df: pd.DataFrame) -> pd.DataFrame:
         logger.error(f"Whale address file not found: {address_file}")
         return pd.DataFrame()
 
-    addresses = pd.read_csv(address_file)["address"].dropna().unique().tolist()
+    # Only the address column is needed; reading it as str skips type inference
+    addresses = pd.read_csv(address_file, usecols=["address"], dtype={"address": str})["address"].dropna().drop_duplicates().tolist()
     logger.info(f"Processing {len(addresses)} whale addresses")
     
-    all_whale_txs = []
+    # Raw transfers are buffered as tuples; valuation and the threshold filter run
+    # vectorised over all of them once every wallet has been parsed
+    native_rows = []
+    token_rows = []
     processed_addresses = 0
 
-    for addr in addresses:
+    # Bind the buffer methods once; they are called for every transaction
+    extend_native = native_rows.extend
+    extend_token = token_rows.extend
+
+    # Index prices by date once instead of filtering price_df per transaction
+    price_map, latest_price = build_price_map(price_df)
+
+    cache_dir = cfg.get_path("paths", "cache")
+    cache_ttl = cfg.get("api", "helius", "ttl_minutes", default=15) * 60
+    max_workers = max(1, int(cfg.get("api", "helius", "concurrency", default=MAX_WALLET_WORKERS)))
+
+    # One retrying session for all wallets so Helius connections are pooled and reused
+    session = create_session(pool_maxsize=max_workers)
+
+    def fetch_wallet(addr):
         try:
             logger.debug(f"Fetching transactions for address: {addr}")
-            txs = fetch_transactions_for_wallet(addr, helius_key, base_url)
+            return fetch_transactions_cached(addr, helius_key, base_url, cache_dir, cache_ttl, session=session)
+        except Exception as e:
+            logger.warning(f"Failed to fetch transactions for {addr}: {e}")
+            return None
+
+    # Wallet requests are I/O-bound, so fetch them concurrently and parse afterwards
+    with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        wallet_txs = list(executor.map(fetch_wallet, addresses))
+
+    for addr, txs in zip(addresses, wallet_txs):
+        if txs is None:
+            continue
+
+        try:
             processed_addresses += 1
             
-            logger.debug(f"Retrieved {len(txs)} transactions for {addr}")
+            logger.debug("Retrieved %d transactions for %s", len(txs), addr)
+
+            # Format all of this wallet's transaction dates in one vectorised pass;
+            # transactions with a missing or unusable timestamp are masked out
+            ts_secs = np.fromiter((_as_float(tx.get("timestamp")) for tx in txs), dtype=np.float64, count=len(txs))
+            has_date = np.isfinite(ts_secs) & (np.abs(ts_secs) < MAX_TIMESTAMP_SECONDS)
+            date_strs = pd.to_datetime(np.where(has_date, ts_secs, 0), unit="s").strftime("%Y-%m-%d").to_numpy()
 
             for i, tx in enumerate(txs):
                 try:
-                    timestamp = datetime.utcfromtimestamp(tx["timestamp"])
-                    date_str = timestamp.strftime("%Y-%m-%d")
-                    
+                    if not has_date[i]:
+                        logger.debug("Skipping tx %d for %s: missing or invalid timestamp", i, addr)
+                        continue
+
+                    date_str = date_strs[i]
+
                     # Get SOL price (now uses fallback if exact date not found)
-                    price_usd = get_token_price_usd(date_str, price_df)
+                    price_usd = get_token_price_usd(date_str, price_map, latest_price)
                     
                     if price_usd == 0.0:
-                        logger.debug(f"No price data available, skipping transaction")
+                        logger.debug("No price data available, skipping transaction")
                         continue
 
-                    # Process NATIVE SOL transfers
+                    unix_ts = int(ts_secs[i])
+                    signature = tx.get("signature")
+
+                    # Buffer NATIVE SOL transfers (amount in lamports)
                     native_transfers = tx.get("nativeTransfers", [])
                     if native_transfers:
-                        logger.debug(f"Found {len(native_transfers)} native transfers in tx {i}")
-                    
-                    for transfer in native_transfers:
-                        try:
-                            # The amount is in lamports (confirmed from debug output)
-                            amount_lamports = float(transfer.get("amount", 0))
-                            amount_sol = amount_lamports / 1e9  # Convert lamports to SOL
-                            usd_value = amount_sol * price_usd
-
-                            logger.debug(f"Native transfer: {amount_sol:.4f} SOL = ${usd_value:.2f} USD (threshold: ${whale_threshold})")
-
-                            if usd_value >= whale_threshold:
-                                logger.info(f"WHALE NATIVE: ${usd_value:,.2f} ({amount_sol:.4f} SOL)")
-                                all_whale_txs.append({
-                                    "wallet": addr,
-                                    "type": "NATIVE_SOL",
-                                    "amount": amount_sol,
-                                    "usd_value": usd_value,
-                                    "from": transfer.get("fromUserAccount"),
-                                    "to": transfer.get("toUserAccount"),
-                                    "timestamp": timestamp,
-                                    "date": date_str,
-                                    "signature": tx.get("signature"),
-                                    "token_address": "So11111111111111111111111111111111111111112"  # Native SOL
-                                })
-                        except Exception as e:
-                            logger.warning(f"Error processing native transfer: {e}")
-                            continue
-
-                    # Process TOKEN transfers
+                        logger.debug("Found %d native transfers in tx %d", len(native_transfers), i)
+                    extend_native(
+                        (addr, transfer.get("amount", 0), price_usd, transfer.get("fromUserAccount"),
+                         transfer.get("toUserAccount"), unix_ts, date_str, signature)
+                        for transfer in native_transfers
+                    )
+
+                    # Buffer TOKEN transfers (tokenAmount is already in decimal format)
                     token_transfers = tx.get("tokenTransfers", [])
                     if token_transfers:
-                        logger.debug(f"Found {len(token_transfers)} token transfers in tx {i}")
-                    
-                    for transfer in token_transfers:
-                        try:
-                            mint = transfer.get("mint", "")
-                            # The tokenAmount field is already in decimal format (confirmed from debug)
-                            amount = float(transfer.get("tokenAmount", 0))
-                            
-                            # Handle different token types
-                            if mint == "So11111111111111111111111111111111111111112":  # Wrapped SOL
-                                token_symbol = "wSOL"
-                                token_price_usd = price_usd
-                            elif mint == "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v":  # USDC
-                                token_symbol = "USDC"
-                                token_price_usd = 1.0
-                            elif mint == "Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB":  # USDT
-                                token_symbol = "USDT"
-                                token_price_usd = 1.0
-                            else:
-                                token_symbol = f"TOKEN-{mint[:8]}..."
-                                token_price_usd = 1.0  # Assume $1 for unknown tokens
-                                
-                            usd_value = amount * token_price_usd
-
-                            logger.debug(f"Token transfer: {amount:.4f} {token_symbol} = ${usd_value:.2f} USD (threshold: ${whale_threshold})")
-
-                            if usd_value >= whale_threshold:
-                                logger.info(f"WHALE TOKEN: ${usd_value:,.2f} ({amount:.4f} {token_symbol})")
-                                all_whale_txs.append({
-                                    "wallet": addr,
-                                    "type": "TOKEN",
-                                    "amount": amount,
-                                    "usd_value": usd_value,
-                                    "from": transfer.get("fromUserAccount"),
-                                    "to": transfer.get("toUserAccount"),
-                                    "timestamp": timestamp,
-                                    "date": date_str,
-                                    "signature": tx.get("signature"),
-                                    "token_address": mint,
-                                    "token_symbol": token_symbol
-                                })
-                        except Exception as e:
-                            logger.warning(f"Error processing token transfer: {e}")
-                            continue
+                        logger.debug("Found %d token transfers in tx %d", len(token_transfers), i)
+                    extend_token(
+                        (addr, transfer.get("tokenAmount", 0), price_usd, transfer.get("fromUserAccount"),
+                         transfer.get("toUserAccount"), unix_ts, date_str, signature, transfer.get("mint", ""))
+                        for transfer in token_transfers
+                    )
 
                 except Exception as e:
                     logger.warning(f"Error processing transaction {i} for {addr}: {e}")
                     continue
 
         except Exception as e:
-            logger.warning(f"Failed to fetch transactions for {addr}: {e}")
+            logger.warning(f"Error processing transactions for {addr}: {e}")
             continue
 
     logger.info(f"Processed {processed_addresses}/{len(addresses)} addresses")
-    logger.info(f"Found {len(all_whale_txs)} whale transactions")
-
-    df = pd.DataFrame(all_whale_txs)
+    df = build_whale_frame(native_rows, token_rows, whale_threshold)
+    logger.info(f"Found {len(df)} whale transactions")
 
     if df.empty:
         logger.warning("No whale transactions found after filtering")
@@ -221,14 +367,21 @@ def fetch_whale_transactions(cfg, price_df: pd.DataFrame) -> pd.DataFrame:
         logger.info("  - Or check if whale addresses have historical activity in your date range")
         return df
 
-    # Sort by USD value descending
-    df = df.sort_values("usd_value", ascending=False)
+    # Lead with the top_k largest transfers, found by partial sort; the rest keep
+    # their parse order. Unset leaves ordering to the consumer.
+    top_k = cfg.top_k_sort
+    if top_k is not None:
+        if top_k >= len(df):
+            df = df.sort_values("usd_value", ascending=False, kind="stable")
+        elif 0 < top_k < len(df):
+            top_idx = np.argpartition(-df["usd_value"].to_numpy(), top_k)[:top_k]
+            top = df.iloc[top_idx].sort_values("usd_value", ascending=False, kind="stable")
+            df = pd.concat([top, df.drop(top.index)])
 
     output_dir = cfg.get_path("paths", "processed_data")
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    output_file = output_dir / "whale_transactions.csv"
-    df.to_csv(output_file, index=False)
+    output_file = save_frame(df, output_dir / "whale_transactions", cfg)
     
     logger.info(f"Whale transactions saved to: {output_file}")
     logger.info(f"Top whale transaction: ${df['usd_value'].max():,.2f}")
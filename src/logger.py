@@ -1,8 +1,11 @@
 # src/logger.py
 
+import atexit
 import logging
-from pathlib import Path
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
 
 # Set up log directory and file path
 LOG_DIR = Path("logs")
@@ -23,10 +26,17 @@ if not logger.handlers:
     file_handler = logging.FileHandler(LOG_FILE, mode="a", encoding="utf-8")
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(logging.Formatter(fmt=LOG_FORMAT, datefmt=DATE_FORMAT))
-    logger.addHandler(file_handler)
 
     # Console handler (DEBUG level)
     console_handler = logging.StreamHandler(stream=sys.stdout)
     console_handler.setLevel(logging.DEBUG)
     console_handler.setFormatter(logging.Formatter(fmt=LOG_FORMAT, datefmt=DATE_FORMAT))
-    logger.addHandler(console_handler)
+
+    # Callers only enqueue records; a background listener does the file and console writes
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+
+    # Flush queued records before the interpreter shuts down
+    atexit.register(listener.stop)
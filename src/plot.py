@@ -1,12 +1,73 @@
 # src/plot.py
 
+import os
+import sys
 import pandas as pd
-import matplotlib.pyplot as plt
+from functools import cache
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
 from src.logger import logger
 
+# Collapse line segments that are closer together than a pixel; applied per
+# figure so global rcParams are left untouched
+SIMPLIFY_RC = {"path.simplify": True, "path.simplify_threshold": 1.0}
+
+
+@cache
+def load_pyplot():
+    """
+    Import matplotlib.pyplot on first use, configured for headless rendering.
+
+    Keeping the import out of module scope means runs that fail before
+    plotting never pay matplotlib's import cost. The setup runs once per
+    process, and the Agg backend is only selected when neither pyplot nor
+    MPLBACKEND has already chosen one.
+
+    Returns:
+        module: The matplotlib.pyplot module.
+    """
+    import matplotlib
+    if "matplotlib.pyplot" not in sys.modules and not os.environ.get("MPLBACKEND"):
+        matplotlib.use("Agg")  # Headless backend; figures are only written to disk
+
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def downsample_for_plot(price_df: pd.DataFrame, whale_df: pd.DataFrame,
+                        target_points: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Thin price and whale series to roughly one point per horizontal pixel.
+
+    Whale volume is always summed per day first, so each date gets a single
+    bar rather than one per transaction.
+
+    Args:
+        price_df (pd.DataFrame): Token price data with 'date' and 'price'.
+        whale_df (pd.DataFrame): Whale transaction data with 'date' and 'usd_value'.
+        target_points (int): Approximate number of points to keep per series.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: Downsampled price and whale data.
+    """
+    if len(price_df) > 2 * target_points:
+        step = len(price_df) // target_points
+        price_df = price_df.iloc[::step]
+
+    whale_df = whale_df.groupby("date", as_index=False, sort=False)["usd_value"].sum()
+
+    if len(whale_df) > 2 * target_points:
+        # Sum whale volume into equal-width date buckets
+        buckets = pd.cut(whale_df["date"], bins=target_points)
+        whale_df = (
+            whale_df.groupby(buckets, observed=True)
+            .agg(date=("date", "min"), usd_value=("usd_value", "sum"))
+            .reset_index(drop=True)
+        )
+
+    return price_df, whale_df
+
 
 def plot_price_vs_whale(price_df: pd.DataFrame, whale_df: pd.DataFrame, cfg) -> Optional[Path]:
     """
@@ -27,24 +88,32 @@ def plot_price_vs_whale(price_df: pd.DataFrame, whale_df: pd.DataFrame, cfg) ->
         figures_path.mkdir(parents=True, exist_ok=True)
 
         # Get plot settings from config
-        figsize = tuple(cfg.get("plot", "figsize", default=[12, 6]))
+        figsize = cfg.figsize
         price_color = cfg.get("plot", "price_color", default="blue")
         whale_color = cfg.get("plot", "whale_color", default="orange")
+        dpi = cfg.get("plot", "dpi", default=80)
 
-        # Initialize plot
-        plt.figure(figsize=figsize)
-        plt.plot(price_df["date"], price_df["price"], label="Token Price", color=price_color)
-        plt.bar(whale_df["date"], whale_df["usd_value"], label="Whale Volume", color=whale_color, alpha=0.5)
+        price_df, whale_df = downsample_for_plot(price_df, whale_df, int(figsize[0] * dpi))
 
-        plt.title("Token Price vs Whale Activity")
-        plt.xlabel("Date")
-        plt.ylabel("USD Value")
-        plt.legend()
-        plt.tight_layout()
+        plt = load_pyplot()
 
         plot_file = figures_path / "price_vs_whale.png"
-        plt.savefig(plot_file)
-        plt.close()
+
+        # Paths read the simplify settings when drawn, so keep the context open through savefig
+        with plt.rc_context(SIMPLIFY_RC):
+            # Initialize plot
+            fig, ax = plt.subplots(figsize=figsize, layout="constrained")
+            ax.plot(price_df["date"], price_df["price"], label="Token Price", color=price_color)
+            # vlines draws a single LineCollection instead of one Rectangle patch per bar
+            ax.vlines(whale_df["date"], 0, whale_df["usd_value"], label="Whale Volume", color=whale_color, alpha=0.5)
+
+            ax.set_title("Token Price vs Whale Activity")
+            ax.set_xlabel("Date")
+            ax.set_ylabel("USD Value")
+            ax.legend()
+
+            fig.savefig(plot_file, dpi=dpi)
+            plt.close(fig)
 
         logger.info(f"Plot saved to: {plot_file}")
         return plot_file
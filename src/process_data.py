@@ -4,6 +4,7 @@ import pandas as pd
 from pathlib import Path
 from typing import Tuple
 from src.logger import logger
+from src.storage import save_frame
 
 
 def preprocess_price_data(raw_price_df: pd.DataFrame) -> pd.DataFrame:
@@ -43,8 +44,8 @@ def preprocess_whale_data(raw_whale_df: pd.DataFrame) -> pd.DataFrame:
     logger.info("Preprocessing whale transaction data...")
 
     try:
-        raw_whale_df["date"] = pd.to_datetime(raw_whale_df["timestamp"]).dt.strftime("%Y-%m-%d")
-        raw_whale_df["date"] = pd.to_datetime(raw_whale_df["date"])
+        # Truncate to midnight directly; timestamps stay naive to match the price dates
+        raw_whale_df["date"] = pd.to_datetime(raw_whale_df["timestamp"]).dt.floor("D")
         clean_whale_df = raw_whale_df[["date", "usd_value"]].dropna()
 
         logger.info(f"Processed whale data shape: {clean_whale_df.shape}")
@@ -75,15 +76,14 @@ def preprocess_data(raw_whale_df: pd.DataFrame, raw_price_df: pd.DataFrame) -> T
         logger.warning("One or both datasets are empty after preprocessing.")
         return pd.DataFrame(), pd.DataFrame()
 
-    # Align both DataFrames on shared 'date' values
-    shared_dates = whale_df["date"].isin(price_df["date"])
-    whale_df = whale_df[shared_dates]
-
-    shared_dates = price_df["date"].isin(whale_df["date"])
-    price_df = price_df[shared_dates]
+    # Align both DataFrames on shared 'date' values. Selecting the sorted common
+    # dates also leaves both frames in date order for the downstream join.
+    common_dates = pd.Index(whale_df["date"].unique(), name="date").intersection(price_df["date"].unique()).sort_values()
+    whale_df = whale_df.set_index("date").loc[common_dates].reset_index()
+    price_df = price_df.set_index("date").loc[common_dates].reset_index()
 
     logger.info(f"Aligned data → Whale: {whale_df.shape}, Price: {price_df.shape}")
-    return whale_df.reset_index(drop=True), price_df.reset_index(drop=True)
+    return whale_df, price_df
 
 
 def save_processed_data(price_df: pd.DataFrame, whale_df: pd.DataFrame, cfg) -> None:
@@ -101,11 +101,8 @@ def save_processed_data(price_df: pd.DataFrame, whale_df: pd.DataFrame, cfg) ->
         processed_path: Path = cfg.get_path("paths", "processed_data")
         processed_path.mkdir(parents=True, exist_ok=True)
 
-        price_file = processed_path / "price_data.csv"
-        whale_file = processed_path / "whale_data.csv"
-
-        price_df.to_csv(price_file, index=False)
-        whale_df.to_csv(whale_file, index=False)
+        price_file = save_frame(price_df, processed_path / "price_data", cfg)
+        whale_file = save_frame(whale_df, processed_path / "whale_data", cfg)
 
         logger.info(f"Processed price data saved to: {price_file}")
         logger.info(f"Processed whale data saved to: {whale_file}")
@@ -0,0 +1,43 @@
+# src/session.py
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def create_session(pool_maxsize: int = 10) -> requests.Session:
+    """
+    Create a requests Session that retries transient failures with exponential backoff.
+
+    Retries are handled by the connection adapter, so callers keep using
+    session.get() and raise_for_status() as usual. Once retries are exhausted
+    the last response is returned rather than raising, so HTTP errors still
+    surface as requests.exceptions.HTTPError.
+
+    The pool blocks when every connection is busy, so bursts of concurrent
+    requests wait for a kept-alive connection instead of opening (and then
+    discarding) extra TLS connections to the same host.
+
+    Args:
+        pool_maxsize (int): Connections kept alive per host; match the number
+            of threads sharing the session.
+
+    Returns:
+        requests.Session: Session with retrying adapters mounted for http and https.
+    """
+    retry = Retry(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=pool_maxsize, pool_block=True, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,37 @@
+# src/storage.py
+
+import pandas as pd
+from pathlib import Path
+
+# Supported table formats and the file suffix each one writes
+OUTPUT_SUFFIXES = {"parquet": ".parquet", "csv": ".csv"}
+
+
+def save_frame(df: pd.DataFrame, output_file: Path, cfg) -> Path:
+    """
+    Write a DataFrame in the format selected by io.format in the config.
+
+    Parquet (the default) is written with pyarrow and zstd compression;
+    CSV is kept for users who want human-readable intermediates.
+
+    Args:
+        df (pd.DataFrame): Data to write.
+        output_file (Path): Destination; its suffix is replaced to match the format.
+        cfg (Config): Configuration object.
+
+    Returns:
+        Path: The file that was written.
+
+    Raises:
+        ValueError: If io.format is not a supported format.
+    """
+    fmt = str(cfg.get("io", "format", default="parquet")).lower()
+    if fmt not in OUTPUT_SUFFIXES:
+        raise ValueError(f"Unsupported output format: {fmt}")
+
+    output_file = output_file.with_suffix(OUTPUT_SUFFIXES[fmt])
+    if fmt == "parquet":
+        df.to_parquet(output_file, engine="pyarrow", compression="zstd", index=False)
+    else:
+        df.to_csv(output_file, index=False)
+    return output_file